@@ -3,6 +3,7 @@
 Everything‑like Indexer for Linux – Clean Working Version.
 Now with BULK DELETE and OPEN CONTAINING FOLDER
 """
+import functools
 import os
 import re
 import csv
@@ -12,9 +13,13 @@ import sys
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, Menu, Listbox, Scrollbar, simpledialog
 from datetime import datetime
-from threading import Thread
+from threading import Thread, Lock, Event
+from concurrent.futures import ThreadPoolExecutor
+import queue
 import shutil
 import subprocess  # Added for clipboard operations
+import uuid
+from urllib.parse import quote
 
 
 # ==================== PLATFORM-INDEPENDENT PATHS ====================
@@ -52,43 +57,62 @@ CONFIG_DIR = get_config_dir()
 DB_PATH = os.path.join(APP_DATA_DIR, "everything_index.db")
 SETTINGS_FILE = os.path.join(CONFIG_DIR, "settings.json")
 
+# One compiled alternation covering every path shape we recognise, so a
+# drive lookup is a single regex-engine pass instead of four match/search
+# calls, per-row splits and startswith probes:
+#   win       C:\... or C:/...
+#   media     first single-letter component under /media/<user>/
+#   medianame multi-letter volume label under /media/<user>/
+#   mnt       /mnt/M/...
+#   mid       first single-letter directory anywhere in the path
+_DRIVE_RE = re.compile(
+    r'^(?:'
+    r'(?P<win>[A-Za-z]):'
+    r'|/media/[^/]+(?:/[^/]+)*?/(?P<media>[A-Za-z])(?:/|$)'
+    r'|/media/[^/]+/(?P<medianame>[^/]+)'
+    r'|/mnt/(?P<mnt>[A-Za-z])(?:/|$)'
+    r'|.*?/(?P<mid>[A-Za-z])/'
+    r')'
+)
+
+# Filename validation tables, compiled once: one C-level regex scan and a
+# frozenset probe instead of a per-call char list walk and 22-name list scan
+_INVALID_FILENAME_RE = re.compile(r'[\\/:*?"<>|]')
+
+# Human-readable size parsing: magnitude and optional unit in one pass
+_SIZE_RE = re.compile(r'^\s*([\d.]+)\s*([KMGTP]?B)?\s*$', re.I)
+_SIZE_MULT = {'B': 1, 'KB': 1 << 10, 'MB': 1 << 20,
+              'GB': 1 << 30, 'TB': 1 << 40, 'PB': 1 << 50}
+_RESERVED_NAMES = frozenset({
+    'CON', 'PRN', 'AUX', 'NUL',
+    'COM1', 'COM2', 'COM3', 'COM4', 'COM5', 'COM6', 'COM7', 'COM8', 'COM9',
+    'LPT1', 'LPT2', 'LPT3', 'LPT4', 'LPT5', 'LPT6', 'LPT7', 'LPT8', 'LPT9',
+})
+
 def extract_drive_letter(path):
     """Extract drive letter from path like /media/user/M/..."""
     if not path or not isinstance(path, str):
         return "Unknown"
-    
-    # Clean the path
-    path = path.strip()
-    
-    # Case 1: Windows path with drive letter (C:, D:, M:, etc.)
-    windows_match = re.match(r'^([A-Za-z]):', path)
-    if windows_match:
-        return windows_match.group(1).upper()
-    
-    # Case 2: Linux path format: /media/username/M/...
-    if path.startswith('/media/'):
-        parts = path.split('/')
-        if len(parts) >= 4:
-            # Look for single letter after /media/username/
-            for part in parts[3:]:
-                if len(part) == 1 and part.isalpha():
-                    return part.upper()
-            return parts[3].upper()
-    
-    # Case 3: Linux path format: /mnt/M/...
-    if path.startswith('/mnt/'):
-        parts = path.split('/')
-        if len(parts) >= 3:
-            drive = parts[2]
-            if len(drive) == 1 and drive.isalpha():
-                return drive.upper()
-    
-    # Case 4: Look for single letter directory
-    match = re.search(r'/([A-Za-z])/', path)
-    if match:
-        return match.group(1).upper()
-    
-    return "Unknown"
+
+    m = _DRIVE_RE.match(path.strip())
+    if not m:
+        return "Unknown"
+    return (m.group('win') or m.group('media') or m.group('medianame')
+            or m.group('mnt') or m.group('mid')).upper()
+
+def _drive_root(full_path):
+    """Mount point a path lives under: /media/user/Drive for removable
+    media, otherwise the first path component. Locates the cut point with
+    str.find and slices — no split() list of every segment just to rejoin
+    the first few."""
+    if full_path.startswith('/media/'):
+        # Third slash after /media/ ends /media/<user>/<drive>
+        i = full_path.find('/', 7)
+        if i >= 0:
+            i = full_path.find('/', i + 1)
+        return full_path if i < 0 else full_path[:i]
+    j = full_path.find('/', 1)
+    return full_path[:j] if j > 0 else full_path
 
 # ==================== CLIPBOARD FUNCTIONS (Universal) ====================
 def copy_to_clipboard(text):
@@ -134,15 +158,129 @@ def copy_to_clipboard(text):
     except:
         return False
 
+# ==================== TRASH ====================
+_TRASH_FILES = os.path.expanduser('~/.local/share/Trash/files')
+_TRASH_INFO = os.path.expanduser('~/.local/share/Trash/info')
+
+def move_to_trash(path):
+    """Move path into the freedesktop trash without spawning a subprocess.
+
+    Shelling out to `gio trash` costs a fork+exec per file, which
+    dominates bulk deletes. The spec itself is just a move into
+    Trash/files plus a .trashinfo sidecar in Trash/info.
+    """
+    os.makedirs(_TRASH_FILES, exist_ok=True)
+    os.makedirs(_TRASH_INFO, exist_ok=True)
+    # Collision-proof name up front; no stat-probing for a free slot
+    name, ext = os.path.splitext(os.path.basename(path))
+    target_name = f"{name}-{uuid.uuid4().hex[:8]}{ext}"
+    target = os.path.join(_TRASH_FILES, target_name)
+    try:
+        # Atomic single-syscall move on the same filesystem
+        os.rename(path, target)
+    except OSError:
+        # Cross-device (file on another drive): copy + unlink
+        shutil.move(path, target)
+    with open(os.path.join(_TRASH_INFO, target_name + '.trashinfo'), 'w') as f:
+        f.write("[Trash Info]\n"
+                f"Path={quote(path)}\n"
+                f"DeletionDate={datetime.now().strftime('%Y-%m-%dT%H:%M:%S')}\n")
+
 # ==================== DATABASE ====================
-def init_db():
+def _apply_pragmas(conn):
+    c = conn.cursor()
+    c.execute("PRAGMA journal_mode=WAL")
+    c.execute("PRAGMA synchronous=NORMAL")
+    c.execute("PRAGMA temp_store=MEMORY")
+    c.execute("PRAGMA cache_size=-65536")
+    c.execute("PRAGMA mmap_size=268435456")
+    # Any REPLACE-style statement deletes the conflicting row; without
+    # recursive triggers that implicit delete would bypass the FTS sync
+    # triggers below, silently desyncing the index
+    c.execute("PRAGMA recursive_triggers=ON")
+
+# True once init_db has set up the FTS5 trigram index; builds of SQLite
+# without FTS5/trigram support fall back to plain LIKE searches.
+_fts_enabled = False
+
+def open_db():
+    """Open a fresh connection to the index DB with performance PRAGMAs applied.
+
+    WAL lets searches run while an index is in progress, and
+    synchronous=NORMAL drops the fsync-per-commit cost of the default
+    rollback journal. Background indexing threads use this; everything
+    else should go through get_db().
+    """
     conn = sqlite3.connect(DB_PATH)
+    _apply_pragmas(conn)
+    return conn
+
+# Shared process-lifetime connection. Opening/parsing/closing a connection
+# per helper call was the dominant cost of keystroke-triggered searches.
+# Writes through it must hold _db_write_lock: Tk callbacks and background
+# scan threads both reach the helpers below, and interleaved transactions
+# on one connection would commit each other's half-done work.
+_shared_conn = None
+_db_write_lock = Lock()
+
+def get_db():
+    """Return the shared long-lived connection, opening it on first use."""
+    global _shared_conn
+    if _shared_conn is None:
+        _shared_conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+        _apply_pragmas(_shared_conn)
+    return _shared_conn
+
+def close_db():
+    """Close the shared connection (needed before deleting the DB file)."""
+    global _shared_conn
+    if _shared_conn is not None:
+        _shared_conn.close()
+        _shared_conn = None
+
+# Read-only connection pool. Under WAL, readers never block the writer
+# (or each other), but only if they are on their own connections: a read
+# sharing _shared_conn waits on the connection mutex whenever an indexing
+# thread is mid-transaction. Searches and counts check a reader out so
+# the UI stays responsive while a scan is writing.
+_reader_pool = queue.Queue(maxsize=3)
+
+def get_reader():
+    """Check a read-only connection out of the pool, opening one on demand."""
+    try:
+        return _reader_pool.get_nowait()
+    except queue.Empty:
+        pass
+    try:
+        conn = sqlite3.connect('file:{}?mode=ro'.format(DB_PATH),
+                               uri=True, check_same_thread=False)
+    except sqlite3.OperationalError:
+        # DB file not created yet (first run before init_db commits):
+        # fall back to the shared connection
+        return get_db()
+    c = conn.cursor()
+    c.execute("PRAGMA cache_size=-65536")
+    c.execute("PRAGMA mmap_size=268435456")
+    return conn
+
+def put_reader(conn):
+    """Return a reader to the pool; surplus connections are just closed."""
+    if conn is _shared_conn:
+        return
+    try:
+        _reader_pool.put_nowait(conn)
+    except queue.Full:
+        conn.close()
+
+def init_db():
+    conn = get_db()
     c = conn.cursor()
     c.execute('''
         CREATE TABLE IF NOT EXISTS folders (
             id INTEGER PRIMARY KEY,
             path TEXT UNIQUE,
-            excluded TEXT DEFAULT ''
+            excluded TEXT DEFAULT '',
+            excluded_i INTEGER DEFAULT 0
         )
     ''')
     c.execute('''
@@ -155,144 +293,394 @@ def init_db():
             modified REAL,
             type TEXT,
             indexed_date REAL,
+            drive TEXT,
             FOREIGN KEY (folder_id) REFERENCES folders (id)
         )
     ''')
+    # Migrate databases created before the drive column existed
+    try:
+        c.execute('ALTER TABLE files ADD COLUMN drive TEXT')
+    except sqlite3.OperationalError:
+        pass
+    # Mirror the 'EXCLUDED' marker into a boolean column so the folder
+    # count can be answered from a partial index; string inequality on the
+    # TEXT column forced a full scan of folders on every status update.
+    # The TEXT column still holds the subfolder exclusion patterns.
+    try:
+        c.execute('ALTER TABLE folders ADD COLUMN excluded_i INTEGER DEFAULT 0')
+        c.execute("UPDATE folders SET excluded_i = 1 WHERE excluded = 'EXCLUDED'")
+    except sqlite3.OperationalError:
+        pass
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_folders_active
+                 ON folders (id) WHERE excluded_i = 0''')
     c.execute('CREATE INDEX IF NOT EXISTS idx_name ON files (name COLLATE NOCASE)')
     c.execute('CREATE INDEX IF NOT EXISTS idx_type ON files (type COLLATE NOCASE)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_drive ON files (drive)')
+    # Covering index for per-folder work: excluded-folder deletes become a
+    # range scan, and the cleanup pass (SELECT path / DELETE ... path NOT IN)
+    # is answered from the index without touching table rows. Replaces the
+    # earlier single-column folder_id index.
+    c.execute('DROP INDEX IF EXISTS idx_files_folder')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_files_folder_path ON files (folder_id, path)')
+
+    # Trigram FTS index over names: LIKE '%term%' can never use idx_name
+    # (leading wildcard), so plain substring searches were full scans.
+    global _fts_enabled
+    try:
+        c.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='files_fts'")
+        fts_exists = c.fetchone() is not None
+        if not fts_exists:
+            c.execute('''CREATE VIRTUAL TABLE files_fts USING fts5(
+                name, content='files', content_rowid='id', tokenize='trigram')''')
+            c.execute("INSERT INTO files_fts(files_fts) VALUES('rebuild')")
+        c.execute('''CREATE TRIGGER IF NOT EXISTS files_fts_ai AFTER INSERT ON files BEGIN
+                INSERT INTO files_fts(rowid, name) VALUES (new.id, new.name);
+            END''')
+        c.execute('''CREATE TRIGGER IF NOT EXISTS files_fts_ad AFTER DELETE ON files BEGIN
+                INSERT INTO files_fts(files_fts, rowid, name) VALUES ('delete', old.id, old.name);
+            END''')
+        c.execute('''CREATE TRIGGER IF NOT EXISTS files_fts_au AFTER UPDATE OF name ON files BEGIN
+                INSERT INTO files_fts(files_fts, rowid, name) VALUES ('delete', old.id, old.name);
+                INSERT INTO files_fts(rowid, name) VALUES (new.id, new.name);
+            END''')
+        _fts_enabled = True
+    except sqlite3.OperationalError:
+        _fts_enabled = False
+
     conn.commit()
-    conn.close()
 
 def get_or_create_folder(folder_path):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("INSERT OR IGNORE INTO folders (path) VALUES (?)", (folder_path,))
-    c.execute("SELECT id FROM folders WHERE path = ?", (folder_path,))
-    folder_id = c.fetchone()[0]
-    conn.commit()
-    conn.close()
+    conn = get_db()
+    with _db_write_lock:
+        c = conn.cursor()
+        c.execute("INSERT OR IGNORE INTO folders (path) VALUES (?)", (folder_path,))
+        c.execute("SELECT id FROM folders WHERE path = ?", (folder_path,))
+        folder_id = c.fetchone()[0]
+        conn.commit()
     return folder_id
 
 def get_excluded_patterns(folder_id):
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_db()
     c = conn.cursor()
     c.execute("SELECT excluded FROM folders WHERE id = ?", (folder_id,))
     row = c.fetchone()
-    conn.close()
     if row and row[0]:
         return [p.strip() for p in row[0].split(';') if p.strip()]
     return []
 
 def update_excluded(folder_path, exclude_pattern):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("SELECT excluded FROM folders WHERE path = ?", (folder_path,))
-    row = c.fetchone()
-    current = row[0] if row and row[0] else ''
-    new_excluded = current + ';' + exclude_pattern if current else exclude_pattern
-    c.execute("UPDATE folders SET excluded = ? WHERE path = ?", (new_excluded, folder_path))
-    conn.commit()
-    conn.close()
+    conn = get_db()
+    with _db_write_lock:
+        c = conn.cursor()
+        c.execute("SELECT excluded FROM folders WHERE path = ?", (folder_path,))
+        row = c.fetchone()
+        current = row[0] if row and row[0] else ''
+        new_excluded = current + ';' + exclude_pattern if current else exclude_pattern
+        c.execute("UPDATE folders SET excluded = ? WHERE path = ?", (new_excluded, folder_path))
+        conn.commit()
 
 def get_excluded_folders():
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_db()
     c = conn.cursor()
-    c.execute("SELECT path FROM folders WHERE excluded = 'EXCLUDED'")
+    c.execute("SELECT path FROM folders WHERE excluded_i = 1")
     excluded_paths = {row[0] for row in c.fetchall()}
-    conn.close()
     return excluded_paths
 
+# Stable statement text so sqlite3's prepared-statement cache always hits
+# for row deletes, wherever they are issued from
+_DELETE_FILE_SQL = "DELETE FROM files WHERE path = ?"
+
+# Multi-row INSERT templates keyed by row count. Even with executemany,
+# SQLite steps the VDBE once per row; packing ~100 rows into one
+# VALUES (...),(...) statement amortises that. 100 rows x 8 columns stays
+# under the default 999 bound-variable limit.
+_INSERT_ROWS_PER_STMT = 100
+_insert_sql_cache = {}
+
+def _bulk_insert(c, rows):
+    i = 0
+    total = len(rows)
+    while i < total:
+        group = rows[i:i + _INSERT_ROWS_PER_STMT]
+        n = len(group)
+        sql = _insert_sql_cache.get(n)
+        if sql is None:
+            values = ','.join(['(?,?,?,?,?,?,?,?)'] * n)
+            # Upsert instead of INSERT OR REPLACE: REPLACE deletes the old
+            # row, which churns every index plus the FTS table and burns a
+            # new rowid per rescan. DO UPDATE rewrites in place, and since
+            # name is derived from the conflict key it is omitted from SET,
+            # so the FTS name-update trigger never fires for rescans.
+            sql = ('INSERT INTO files'
+                   '(folder_id,path,name,size,modified,type,indexed_date,drive)'
+                   f' VALUES {values}'
+                   ' ON CONFLICT(path) DO UPDATE SET'
+                   ' folder_id=excluded.folder_id, size=excluded.size,'
+                   ' modified=excluded.modified, type=excluded.type,'
+                   ' indexed_date=excluded.indexed_date, drive=excluded.drive')
+            _insert_sql_cache[n] = sql
+        c.execute(sql, [v for row in group for v in row])
+        i += n
+
+# One scan writes at a time: overlapping index_folder calls would fight
+# for the WAL writer lock and fail mid-transaction, so a second scan
+# queues here until the first finishes.
+_index_lock = Lock()
+
 def index_folder(folder_path, cleanup=False, progress_callback=None):
+    """Index folder_path, returning (ok, file_count, removed_count, msg)."""
     if not os.path.isdir(folder_path):
-        return False, "Invalid folder path."
-    
+        return False, 0, 0, "Invalid folder path."
+    with _index_lock:
+        return _index_folder_locked(folder_path, cleanup, progress_callback)
+
+def _index_folder_locked(folder_path, cleanup, progress_callback):
     folder_id = get_or_create_folder(folder_path)
     excluded_patterns = get_excluded_patterns(folder_id)
     excluded_folders = get_excluded_folders()
     
-    conn = sqlite3.connect(DB_PATH)
+    conn = open_db()
     c = conn.cursor()
     file_count = 0
-    
-    if cleanup:
-        c.execute("SELECT path FROM files WHERE folder_id = ?", (folder_id,))
-        existing_paths = {row[0] for row in c.fetchall()}
-    else:
-        existing_paths = set()
-    
+
+    # path -> stored mtime for this folder; on a re-scan most files are
+    # unchanged and their upsert can be skipped outright
+    c.execute("SELECT path, modified FROM files WHERE folder_id = ?", (folder_id,))
+    mtime_cache = dict(c.fetchall())
+
     seen_paths = set()
-    
+
+    # Every file under folder_path shares its drive; resolve it once
+    # instead of running the drive regex per inserted row
+    drive_letter = extract_drive_letter(folder_path)
+
     if folder_path in excluded_folders:
         conn.close()
-        return True, f"Folder '{os.path.basename(folder_path)}' is excluded (skipped)."
-    
-    for root, dirs, files in os.walk(folder_path):
-        skip_entirely = False
-        for excluded_path in excluded_folders:
-            if root.startswith(excluded_path):
-                skip_entirely = True
-                break
-        
-        if skip_entirely:
-            dirs[:] = []
-            continue
-        
-        rel_root = os.path.relpath(root, folder_path)
-        skip_this = False
-        if rel_root != '.':
-            for pattern in excluded_patterns:
-                if pattern and (rel_root == pattern or rel_root.startswith(pattern + '/')):
-                    skip_this = True
-                    break
-        
-        if skip_this:
-            dirs[:] = []
-            continue
-        
-        for f in files:
-            full = os.path.join(root, f)
+        return True, 0, 0, f"Folder '{os.path.basename(folder_path)}' is excluded (skipped)."
+
+    # Accumulate rows and flush in bulk: one INSERT per file with implicit
+    # commits makes the walk fsync-bound, batching is orders of magnitude faster
+    BATCH_SIZE = 10000
+    batch = []
+    batch_time = datetime.now().timestamp()
+
+    # Intern extension strings: a drive has millions of files but a few
+    # hundred distinct extensions, so rows share one str object per
+    # extension instead of allocating '.jpg' per file
+    ext_cache = {}
+
+    def flush_batch():
+        _bulk_insert(c, batch)
+        batch.clear()
+        # Commit per flushed batch: one transaction spanning the whole
+        # walk would hold the WAL writer lock for the entire scan and
+        # lock out every UI write (delete, rename, exclude) past the
+        # busy timeout. A commit every ~10k rows keeps the batching win
+        # while bounding writer stalls to milliseconds.
+        conn.commit()
+        c.execute("BEGIN")
+
+    c.execute("BEGIN")
+
+    # Precompute exclusion structures once: the per-directory check used to
+    # run startswith against every excluded folder and rebuild 'pattern + /'
+    # strings on each visit. Walking a directory's ancestors against a set
+    # is O(depth), and startswith takes a tuple of prefixes in one C call.
+    excluded_set = frozenset(excluded_folders)
+    pattern_set = frozenset(p for p in excluded_patterns if p)
+    pattern_prefixes = tuple(p + '/' for p in excluded_patterns if p)
+
+    def should_skip(root):
+        p = root
+        while p and p != '/':
+            if p in excluded_set:
+                return True
+            p = os.path.dirname(p)
+        if pattern_set:
+            rel_root = os.path.relpath(root, folder_path)
+            if rel_root != '.':
+                if rel_root in pattern_set or rel_root.startswith(pattern_prefixes):
+                    return True
+        return False
+
+    # Workers walk subtrees with scandir and push chunks of row tuples;
+    # this thread stays the only writer so SQLite never sees contention.
+    # The stat() calls release the GIL, so the walk scales across threads.
+    work_q = queue.Queue(maxsize=32)
+    _done = object()  # sentinel, one per finished worker
+    CHUNK_SIZE = 1000
+    # Set when the writer loop fails so workers stop scanning instead of
+    # blocking forever on a full queue nobody is draining
+    stop_scan = Event()
+
+    # Past this many rows, maintaining the secondary indexes per insert
+    # costs more than rebuilding them once at the end, so drop them when
+    # the running count crosses the threshold and recreate after commit.
+    # Gated on rows actually queued for insert — mtime-unchanged files
+    # don't count, so a no-op rescan of a big folder never pays for a
+    # full-table index rebuild.
+    BULK_INDEX_THRESHOLD = 50000
+    indexes_dropped = False
+    inserted_count = 0
+
+    def scan_subtree(start):
+        # Explicit scandir DFS instead of os.walk + os.stat: os.walk already
+        # stats every entry to classify it, so the extra per-file os.stat
+        # call doubled the metadata syscalls. DirEntry serves both from one.
+        try:
+            chunk = []
+            unchanged = []
+            stack = [start]
+            while stack:
+                if stop_scan.is_set():
+                    return  # finally still posts the sentinel
+                root = stack.pop()
+                if should_skip(root):
+                    continue
+                try:
+                    entries = os.scandir(root)
+                except:
+                    continue
+                with entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                                continue
+                            stat = entry.stat(follow_symlinks=False)
+                            if mtime_cache.get(entry.path) == stat.st_mtime:
+                                unchanged.append(entry.path)
+                            else:
+                                name = entry.name
+                                i = name.rfind('.')
+                                ext = name[i:].lower() if i > 0 else ''
+                                ext = ext_cache.setdefault(ext, ext)
+                                chunk.append((folder_id, entry.path, name,
+                                              stat.st_size, stat.st_mtime,
+                                              ext, batch_time, drive_letter))
+                            if len(chunk) + len(unchanged) >= CHUNK_SIZE:
+                                work_q.put((chunk, unchanged))
+                                chunk = []
+                                unchanged = []
+                        except:
+                            pass
+            if (chunk or unchanged) and not stop_scan.is_set():
+                work_q.put((chunk, unchanged))
+        finally:
+            work_q.put(_done)
+
+    # Split the walk across top-level subtrees; files sitting directly in
+    # folder_path are scanned as their own (non-recursive) unit of work.
+    subtrees = []
+    try:
+        with os.scandir(folder_path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subtrees.append(entry.path)
+                        continue
+                    stat = entry.stat(follow_symlinks=False)
+                    if mtime_cache.get(entry.path) != stat.st_mtime:
+                        name = entry.name
+                        i = name.rfind('.')
+                        ext = name[i:].lower() if i > 0 else ''
+                        ext = ext_cache.setdefault(ext, ext)
+                        batch.append((folder_id, entry.path, name, stat.st_size,
+                                      stat.st_mtime, ext, batch_time,
+                                      drive_letter))
+                    file_count += 1
+                    seen_paths.add(entry.path)
+                except:
+                    pass
+    except:
+        pass
+    inserted_count = len(batch)
+
+    scan_failed = None
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        for subtree in subtrees:
+            pool.submit(scan_subtree, subtree)
+
+        pending = len(subtrees)
+        while pending:
+            item = work_q.get()
+            if item is _done:
+                pending -= 1
+                continue
+            if scan_failed is not None:
+                continue  # draining so workers blocked on put() can exit
+            chunk, unchanged = item
             try:
-                stat = os.stat(full)
-                _, ext = os.path.splitext(f)
-                c.execute('''INSERT OR REPLACE INTO files
-                            (folder_id, path, name, size, modified, type, indexed_date)
-                            VALUES (?,?,?,?,?,?,?)''',
-                          (folder_id, full, f, stat.st_size, stat.st_mtime,
-                           ext.lower(), datetime.now().timestamp()))
-                file_count += 1
-                seen_paths.add(full)
-                if progress_callback and file_count % 100 == 0:
-                    progress_callback(file_count)
-            except:
-                pass
-    
+                batch.extend(chunk)
+                file_count += len(chunk) + len(unchanged)
+                inserted_count += len(chunk)
+                for row in chunk:
+                    seen_paths.add(row[1])
+                seen_paths.update(unchanged)
+                if not indexes_dropped and inserted_count >= BULK_INDEX_THRESHOLD:
+                    c.execute("DROP INDEX IF EXISTS idx_name")
+                    c.execute("DROP INDEX IF EXISTS idx_type")
+                    c.execute("DROP INDEX IF EXISTS idx_drive")
+                    indexes_dropped = True
+                if len(batch) >= BATCH_SIZE:
+                    flush_batch()
+                    batch_time = datetime.now().timestamp()
+            except Exception as e:
+                # Writer died (locked DB, disk full). Tell the workers to
+                # stop and keep consuming the queue so any thread blocked
+                # on put() unblocks — otherwise the pool shutdown waits on
+                # them forever and the scan hangs.
+                scan_failed = e
+                stop_scan.set()
+            if progress_callback:
+                progress_callback(file_count)
+
+    if scan_failed is not None:
+        try:
+            conn.rollback()
+        finally:
+            conn.close()
+        return False, file_count, 0, f"Indexing failed: {scan_failed}"
+
+    if batch:
+        flush_batch()
+
     if cleanup:
-        missing = existing_paths - seen_paths
-        for path in missing:
-            c.execute("DELETE FROM files WHERE path = ?", (path,))
-        removed_count = len(missing)
+        # One planned DELETE against a temp table of seen paths instead of
+        # a Python set difference plus one DELETE statement per missing row
+        c.execute("CREATE TEMP TABLE seen_tmp(path TEXT PRIMARY KEY) WITHOUT ROWID")
+        c.executemany("INSERT OR IGNORE INTO seen_tmp VALUES (?)",
+                      ((p,) for p in seen_paths))
+        c.execute("DELETE FROM files WHERE folder_id = ? AND path NOT IN (SELECT path FROM seen_tmp)",
+                  (folder_id,))
+        removed_count = c.rowcount
+        c.execute("DROP TABLE seen_tmp")
     else:
         removed_count = 0
-    
+
+    if indexes_dropped:
+        c.execute('CREATE INDEX IF NOT EXISTS idx_name ON files (name COLLATE NOCASE)')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_type ON files (type COLLATE NOCASE)')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_drive ON files (drive)')
+
     conn.commit()
     conn.close()
     
     msg = f"Indexed {file_count} files from {os.path.basename(folder_path)}"
     if cleanup and removed_count > 0:
         msg += f", removed {removed_count} missing files."
-    
-    return True, msg
+
+    return True, file_count, removed_count, msg
 
 def rescan_drive(drive_path, cleanup=False):
     if not os.path.isdir(drive_path):
         return False, "Invalid drive path."
     
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_db()
     c = conn.cursor()
-    c.execute("SELECT path FROM folders WHERE path LIKE ? AND excluded != 'EXCLUDED'", 
+    c.execute("SELECT path FROM folders WHERE path LIKE ? AND excluded_i = 0",
               (drive_path + '%',))
     folders = [row[0] for row in c.fetchall()]
-    conn.close()
     
     if not folders:
         return False, f"No indexed folders found under {drive_path}"
@@ -301,19 +689,10 @@ def rescan_drive(drive_path, cleanup=False):
     total_removed = 0
     
     for folder in folders:
-        success, msg = index_folder(folder, cleanup=cleanup)
-        if "Indexed" in msg:
-            parts = msg.split(" ")
-            for i, part in enumerate(parts):
-                if part == "Indexed":
-                    total_files += int(parts[i+1])
-                    break
-        if "removed" in msg:
-            parts = msg.split(" ")
-            for i, part in enumerate(parts):
-                if part == "removed":
-                    total_removed += int(parts[i+1])
-                    break
+        success, file_count, removed_count, _ = index_folder(folder, cleanup=cleanup)
+        if success:
+            total_files += file_count
+            total_removed += removed_count
     
     msg = f"Rescanned {len(folders)} folders on {os.path.basename(drive_path)}: "
     msg += f"{total_files} files processed"
@@ -322,14 +701,58 @@ def rescan_drive(drive_path, cleanup=False):
     
     return True, msg
 
-def search_files(search_term, limit=1000000):
-    conn = sqlite3.connect(DB_PATH)
+# Constant clause fragments plus a template cache keyed by query shape:
+# repeated searches of the same shape then pass byte-identical SQL to
+# sqlite3, so its prepared-statement cache skips the reparse on each call.
+_CLAUSE_INC_EXC = "(name LIKE ? AND name NOT LIKE ?)"
+_CLAUSE_EXC = "(name NOT LIKE ?)"
+_CLAUSE_LIKE = "(name LIKE ?)"
+_CLAUSE_FTS = "(f.id IN (SELECT rowid FROM files_fts WHERE files_fts MATCH ?))"
+# Rows indexed before the drive column existed carry NULL; derive their
+# drive in SQL with substr/instr so the render path never calls back into
+# Python per row. New rows short-circuit through the stored column.
+_DRIVE_SQL = '''COALESCE(f.drive, CASE
+                    WHEN f.path GLOB '[A-Za-z]:*' THEN upper(substr(f.path, 1, 1))
+                    WHEN f.path GLOB '/mnt/?/*' THEN upper(substr(f.path, 6, 1))
+                    WHEN f.path GLOB '/media/*/?/*' THEN upper(substr(f.path, instr(substr(f.path, 8), '/') + 8, 1))
+                    WHEN f.path GLOB '/media/*/*/*' THEN upper(substr(f.path, instr(substr(f.path, 8), '/') + 8,
+                         instr(substr(f.path, instr(substr(f.path, 8), '/') + 8), '/') - 1))
+                    ELSE 'Unknown'
+                END)'''
+# GUI column -> ORDER BY expression; sorting happens in SQLite (which can
+# use idx_name for name-ordered queries) instead of sorting tuples in Python
+_SORT_COLUMNS = {
+    'Name': 'f.name COLLATE NOCASE',
+    'Size': 'f.size',
+    'Type': 'f.type COLLATE NOCASE',
+    'Drive': 'f.drive COLLATE NOCASE',
+    'Path': 'f.path',
+}
+_search_sql_cache = {}
+
+# Delay before a keystroke triggers a search. With FTS-backed, paged queries
+# each search is cheap, so 150ms keeps typing responsive while still
+# collapsing bursts of keystrokes into a single query.
+SEARCH_DEBOUNCE_MS = 150
+
+def search_files(search_term, limit=1000000, sort_col='Name', sort_desc=False,
+                 offset=0, stream=False):
+    # Streaming callers keep the cursor (and so the connection) alive for
+    # as long as they iterate, which would starve the small reader pool;
+    # they stay on the shared connection instead.
+    conn = get_db() if stream else get_reader()
     c = conn.cursor()
+    order = _SORT_COLUMNS.get(sort_col, _SORT_COLUMNS['Name'])
+    direction = 'DESC' if sort_desc else 'ASC'
     if not search_term:
-        query = '''SELECT f.name, f.size, f.type, f.path
+        cache_key = (None, order, direction)
+        query = _search_sql_cache.get(cache_key)
+        if query is None:
+            query = f'''SELECT f.name, f.size, f.type, {_DRIVE_SQL} AS drive, f.path
                    FROM files f JOIN folders fo ON f.folder_id = fo.id
-                   ORDER BY f.indexed_date DESC LIMIT ?'''
-        params = (limit,)
+                   ORDER BY {order} {direction} LIMIT ? OFFSET ?'''
+            _search_sql_cache[cache_key] = query
+        params = (limit, offset)
     else:
         terms = [t.strip() for t in search_term.split('|')]
         queries = []
@@ -340,28 +763,45 @@ def search_files(search_term, limit=1000000):
                 include = include.strip()
                 exclude = exclude.strip()
                 if include:
-                    queries.append("(name LIKE ? AND name NOT LIKE ?)")
+                    queries.append(_CLAUSE_INC_EXC)
                     params.append('%' + include + '%')
                     params.append('%' + exclude + '%')
                 else:
-                    queries.append("(name NOT LIKE ?)")
+                    queries.append(_CLAUSE_EXC)
                     params.append('%' + exclude + '%')
             elif '*' in term or '?' in term:
                 pattern = term.replace('*', '%').replace('?', '_')
-                queries.append("(name LIKE ?)")
+                queries.append(_CLAUSE_LIKE)
                 params.append(pattern)
+            elif _fts_enabled and len(term) >= 3:
+                # Trigram MATCH is index-assisted; LIKE '%term%' scans.
+                # Terms under 3 chars are too short for trigrams.
+                queries.append(_CLAUSE_FTS)
+                params.append('"' + term.replace('"', '""') + '"')
             else:
-                queries.append("(name LIKE ?)")
+                queries.append(_CLAUSE_LIKE)
                 params.append('%' + term + '%')
         where = ' OR '.join(queries)
-        query = f'''SELECT f.name, f.size, f.type, f.path
+        cache_key = (where, order, direction)
+        query = _search_sql_cache.get(cache_key)
+        if query is None:
+            query = f'''SELECT f.name, f.size, f.type, {_DRIVE_SQL} AS drive, f.path
                     FROM files f JOIN folders fo ON f.folder_id = fo.id
                     WHERE {where} COLLATE NOCASE
-                    ORDER BY f.name LIMIT ?'''
+                    ORDER BY {order} {direction} LIMIT ? OFFSET ?'''
+            _search_sql_cache[cache_key] = query
         params.append(limit)
-    c.execute(query, params)
-    rows = c.fetchall()
-    conn.close()
+        params.append(offset)
+    if stream:
+        # Hand back the cursor itself so callers (CSV export) can iterate
+        # row by row without materializing the full result set
+        c.execute(query, params)
+        return c
+    try:
+        c.execute(query, params)
+        rows = c.fetchall()
+    finally:
+        put_reader(conn)
     return rows
 
 # ==================== GUI ====================
@@ -409,6 +849,50 @@ class EverythingApp:
         self.font_size = 14
         self.tree_font_size = 14
 
+        # Results are paged into the Treeview on demand: inserting a
+        # million rows up front freezes Tk no matter how fast the DB is
+        self.page_size = 500
+        self.result_offset = 0
+        self.all_results_loaded = True
+        self.current_term = ''
+        # Monotonic id for keystroke searches; results arriving for an
+        # older token than the latest are dropped (see perform_search)
+        self.search_token = 0
+
+        # Built lazily on first bulk delete, then reused (see build_delete_dialog)
+        self.delete_dialog = None
+
+        # Built lazily on first right-click, then reused (see build_context_menu)
+        self.context_menu = None
+
+        # iid -> full path for the rows currently in the tree. tree.item()
+        # crosses into Tcl and serializes the whole row; handlers that only
+        # need the clicked row's path read this dict instead.
+        self.iid_path = {}
+
+        # iid -> position, so Shift+Home/End and the arrow-extend handlers
+        # find the focused row in O(1) instead of items.index() scanning
+        # every visible row per keypress. Rows only ever append, so the
+        # running length is the position; rebuilt after bulk deletes.
+        self.iid_index = {}
+
+        # Pending after() id for a coalesced refresh (see schedule_refresh)
+        self.refresh_job = None
+
+        # Memoized active-folder count for the status line; None means
+        # stale. Invalidated by refresh_list, so every page of the same
+        # listing reuses one COUNT query (see get_folder_count)
+        self._folder_count = None
+
+        # Starting directory for folder pickers, probed once instead of
+        # stat()ing /media on every dialog open
+        self.initial_dir = '/media' if os.path.isdir('/media') else '/'
+
+        # Settings file cache (keyed by mtime) and save-debounce token
+        self.settings_cache = None
+        self.settings_mtime = 0
+        self.settings_save_job = None
+
         self.style = ttk.Style()
         
         # Matrix theme: Black with green text, semi-transparent
@@ -569,11 +1053,11 @@ class EverythingApp:
         # NEW: Enable multiple selection in treeview
         self.tree.configure(selectmode='extended')  # Allows Ctrl+Click, Shift+Click
         
-        scrollbar = ttk.Scrollbar(frame_results, orient=tk.VERTICAL,
-                                  command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree_scrollbar = ttk.Scrollbar(frame_results, orient=tk.VERTICAL,
+                                            command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self.on_tree_scroll)
         self.tree.grid(row=0, column=0, sticky=(tk.N, tk.S, tk.W, tk.E))
-        scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        self.tree_scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
 
         # Bind keyboard shortcuts for file operations
         self.tree.bind('<F2>', self.smart_rename_or_copy)  # CHANGED TO SMART FUNCTION
@@ -585,6 +1069,7 @@ class EverythingApp:
         # Context menu bindings
         self.tree.bind('<Button-3>', self.show_context_menu)
         self.tree.bind('<ButtonRelease-1>', lambda e: self.tree.focus_set())
+        self.tree.bind('<<TreeviewSelect>>', self.show_selected_path)
         
         # ==================== NEW: KEYBOARD SELECTION BINDINGS ====================
         # Shift+Arrow for selection
@@ -637,18 +1122,44 @@ class EverythingApp:
         self.root.bind('<Control-C>', lambda e: self.copy_selected_path())
         
         init_db()
+
+        # Progress/status messages from indexing threads arrive on this
+        # queue and are applied on the Tk thread by drain_progress_queue;
+        # worker threads must not touch widgets directly.
+        self.progress_q = queue.Queue()
+        self.root.after(50, self.drain_progress_queue)
+
         self.root.after(100, lambda: self.tree.focus_set())
         self.refresh_all()
+
+    def drain_progress_queue(self):
+        """Poll progress from background indexing threads (Tk thread only)."""
+        # Drain everything queued since the last tick but only apply the
+        # newest message: one status_var.set per tick instead of one per
+        # update keeps the Tcl interpreter out of the indexing hot path.
+        latest = None
+        try:
+            while True:
+                latest = self.progress_q.get_nowait()
+        except queue.Empty:
+            pass
+        if latest is not None:
+            if isinstance(latest, int):
+                self.status_var.set(f"Indexing... {latest} files")
+            else:
+                self.status_var.set(latest)
+        self.root.after(50, self.drain_progress_queue)
     
     # ==================== NEW: TAB NAVIGATION METHODS ====================
     def on_search_tab(self, event):
         """Handle Tab from search bar"""
         if event.state & 0x0001:  # Shift+Tab (go backward)
             # Shift+Tab from search should go to treeview if it has items
-            if self.tree.get_children():
+            items = self.tree.get_children()
+            if items:
                 self.tree.focus_set()
                 if not self.tree.selection():
-                    first_item = self.tree.get_children()[0]
+                    first_item = items[0]
                     self.tree.selection_set(first_item)
                     self.tree.focus(first_item)
             return "break"
@@ -665,10 +1176,11 @@ class EverythingApp:
             return "break"
         else:
             # Regular Tab from Clear All goes to treeview if it has items
-            if self.tree.get_children():
+            items = self.tree.get_children()
+            if items:
                 self.tree.focus_set()
                 if not self.tree.selection():
-                    first_item = self.tree.get_children()[0]
+                    first_item = items[0]
                     self.tree.selection_set(first_item)
                     self.tree.focus(first_item)
             return "break"
@@ -714,11 +1226,10 @@ class EverythingApp:
         if not items:
             return "break"
         
-        try:
-            current_index = items.index(focus)
-        except ValueError:
+        current_index = self.iid_index.get(focus)
+        if current_index is None:
             return "break"
-        
+
         if event.keysym == 'Up' and current_index > 0:
             new_index = current_index - 1
         elif event.keysym == 'Down' and current_index < len(items) - 1:
@@ -757,7 +1268,7 @@ class EverythingApp:
             focus = items[0] if items else None
         
         if focus:
-            current_index = items.index(focus)
+            current_index = self.iid_index.get(focus, 0)
             # Select from current to first
             selection_range = items[:current_index + 1]
             self.tree.selection_set(selection_range)
@@ -777,7 +1288,7 @@ class EverythingApp:
             focus = items[0] if items else None
         
         if focus:
-            current_index = items.index(focus)
+            current_index = self.iid_index.get(focus, 0)
             # Select from current to last
             selection_range = items[current_index:]
             self.tree.selection_set(selection_range)
@@ -820,7 +1331,7 @@ class EverythingApp:
                    activebackground='#003300', activeforeground='#00FF00')
         
         # Add paste option
-        menu.add_command(label="Paste", command=lambda: self.paste_into_search())
+        menu.add_command(label="Paste", command=self.paste_into_search)
         
         # Show the menu at cursor position
         menu.tk_popup(event.x_root, event.y_root)
@@ -828,19 +1339,15 @@ class EverythingApp:
     def paste_into_search(self):
         """Paste clipboard content into search bar, replacing selection if any"""
         try:
-            # Get clipboard content using tkinter
-            import tkinter as tk
-            root = tk.Tk()
-            root.withdraw()
-            
+            # Read the clipboard through the app's own interpreter; spinning
+            # up a throwaway Tk() per paste costs milliseconds and leaks
+            # X resources
             try:
-                clipboard_content = root.clipboard_get()
+                clipboard_content = self.root.clipboard_get()
             except tk.TclError:
                 # Clipboard might be empty or contain non-text data
                 clipboard_content = ""
-            
-            root.destroy()
-            
+
             if clipboard_content:
                 # Get current selection range
                 try:
@@ -872,8 +1379,7 @@ class EverythingApp:
         folders_to_open = set()
         
         for item in sel:
-            item_data = self.tree.item(item)
-            file_path = item_data['values'][4]
+            file_path = self.iid_path.get(item)
             if file_path:
                 parent_folder = os.path.dirname(file_path)
                 if os.path.exists(parent_folder):
@@ -884,10 +1390,15 @@ class EverythingApp:
                               "Could not find parent folders for selected items.")
             return
         
-        # Open each unique parent folder
+        # Open each unique parent folder. No shell and no waiting: os.system
+        # forked /bin/sh per folder and blocked until xdg-open returned,
+        # freezing the UI, and quoted filenames could break the command line.
         for folder in folders_to_open:
             try:
-                os.system(f'xdg-open "{folder}"')
+                subprocess.Popen(['xdg-open', folder],
+                                 stdout=subprocess.DEVNULL,
+                                 stderr=subprocess.DEVNULL,
+                                 start_new_session=True)
             except Exception as e:
                 self.status_var.set(f"Error opening folder: {folder}")
         
@@ -907,44 +1418,83 @@ class EverythingApp:
         # Collect all selected files
         files_to_delete = []
         files_to_skip = []  # Files on unmounted drives
-        
+        db_remove = []  # Paths whose DB rows go in one batched transaction
+        tree_remove = []  # Tree items removed in one starred delete call
+
+        def flush_removals():
+            # Tk renumbers the remaining children after every delete, so
+            # removing rows one by one is quadratic on big selections;
+            # one starred call handles the lot in a single pass
+            if tree_remove:
+                self.tree.delete(*tree_remove)
+                for it in tree_remove:
+                    self.iid_path.pop(it, None)
+                tree_remove.clear()
+                # Positions shifted; rebuild the index map in one pass
+                self.iid_index = {iid: i for i, iid
+                                  in enumerate(self.tree.get_children())}
+            # One transaction for the whole selection instead of a
+            # DELETE+commit (and its WAL sync) per file
+            if db_remove:
+                conn = get_db()
+                try:
+                    with _db_write_lock:
+                        with conn:
+                            conn.executemany(_DELETE_FILE_SQL, db_remove)
+                except sqlite3.OperationalError as e:
+                    # DB busy (a scan may hold the writer lock). The files
+                    # are already gone from disk, so keep the rows queued
+                    # for the next flush instead of leaving stale DB rows
+                    # to resurface on refresh.
+                    self.status_var.set(
+                        f"Database busy, {len(db_remove)} removal(s) still pending: {e}")
+                else:
+                    db_remove.clear()
+
+        # mount point -> ismount result, probed once per drive. When a
+        # drive is unplugged, stat-ing every selected file on it can block
+        # (USB/NFS timeouts); one probe answers for the whole selection.
+        mount_alive = {}
+
         for item in sel:
-            item_data = self.tree.item(item)
-            file_path = item_data['values'][4]
-            file_name = item_data['values'][0]
-            
+            file_path = self.iid_path.get(item)
+            file_name = self.tree.item(item, 'values')[0]
+
+            # Extract the mount point (like /media/user/M)
+            path_parts = file_path.split('/')
+            if len(path_parts) >= 4 and path_parts[:2] == ['', 'media']:
+                # Format: /media/username/drive/...
+                mount_point = '/'.join(path_parts[:4])
+            elif len(path_parts) >= 3 and path_parts[:2] == ['', 'mnt']:
+                # Format: /mnt/drive/...
+                mount_point = '/'.join(path_parts[:3])
+            else:
+                mount_point = None
+
+            if mount_point is not None:
+                alive = mount_alive.get(mount_point)
+                if alive is None:
+                    # A plain directory under /mnt or /media (an indexed
+                    # root that was never a mount point) is still
+                    # reachable; only a root that is neither mounted nor
+                    # a directory is genuinely gone
+                    alive = os.path.ismount(mount_point) or os.path.isdir(mount_point)
+                    mount_alive[mount_point] = alive
+                if not alive:
+                    # Drive is gone; skip the per-file stat - ask user
+                    files_to_skip.append((file_path, file_name, mount_point))
+                    continue
+
             # Check if file exists
             if os.path.exists(file_path):
                 files_to_delete.append((file_path, file_name, item))
+            elif mount_point is not None:
+                # This is a mounted drive path - ask user
+                files_to_skip.append((file_path, file_name, mount_point))
             else:
-                # File doesn't exist - check if drive might be unmounted
-                # Extract the mount point (like /media/user/M)
-                path_parts = file_path.split('/')
-                
-                # Check if this looks like a mounted drive path
-                is_mounted_drive_path = False
-                if len(path_parts) >= 4 and path_parts[:2] == ['', 'media']:
-                    # Format: /media/username/drive/...
-                    mount_point = '/'.join(path_parts[:4])
-                    is_mounted_drive_path = True
-                elif len(path_parts) >= 3 and path_parts[:2] == ['', 'mnt']:
-                    # Format: /mnt/drive/...
-                    mount_point = '/'.join(path_parts[:3])
-                    is_mounted_drive_path = True
-                else:
-                    mount_point = None
-                
-                if is_mounted_drive_path:
-                    # This is a mounted drive path - ask user
-                    files_to_skip.append((file_path, file_name, mount_point))
-                else:
-                    # Regular missing file - remove from database
-                    self.tree.delete(item)
-                    conn = sqlite3.connect(DB_PATH)
-                    c = conn.cursor()
-                    c.execute("DELETE FROM files WHERE path = ?", (file_path,))
-                    conn.commit()
-                    conn.close()
+                # Regular missing file - remove from database
+                tree_remove.append(item)
+                db_remove.append((file_path,))
 
         # Handle files on unmounted drives
         if files_to_skip:
@@ -964,31 +1514,30 @@ class EverythingApp:
                 self.status_var.set(f"Skipped {skip_count} files on unmounted drives")
                 # Do nothing - leave them in database
             else:  # User clicked "Yes" = Remove from database
+                # Invert the selection once instead of rescanning it for
+                # every skipped file
+                path_to_item = {self.iid_path.get(it): it for it in sel}
                 for file_path, file_name, _ in files_to_skip:
                     # Remove from treeview and database
-                    for item in sel:
-                        if self.tree.item(item)['values'][4] == file_path:
-                            self.tree.delete(item)
-                            break
-                    
-                    conn = sqlite3.connect(DB_PATH)
-                    c = conn.cursor()
-                    c.execute("DELETE FROM files WHERE path = ?", (file_path,))
-                    conn.commit()
-                    conn.close()
-                
+                    item = path_to_item.get(file_path)
+                    if item is not None:
+                        tree_remove.append(item)
+                    db_remove.append((file_path,))
+
                 self.status_var.set(f"Removed {skip_count} files from database (drive unmounted)")
-            
+
             # Continue with remaining files
             if not files_to_delete:
+                flush_removals()
                 return
         
         # Show confirmation dialog with file list
         response = self.show_bulk_delete_confirmation(files_to_delete)
         
         if response == "cancel":
+            flush_removals()
             return
-        
+
         deleted_count = 0
         failed_files = []
         
@@ -999,33 +1548,15 @@ class EverythingApp:
                     os.remove(file_path)
                     action_type = "permanent"
                 elif response == "trash":
-                    # Try to move to trash (Linux)
-                    try:
-                        # Try using gio trash command (GNOME)
-                        subprocess.run(['gio', 'trash', file_path], check=True)
-                        action_type = "trash"
-                    except:
-                        # Fallback to rename to .trash folder
-                        trash_dir = os.path.expanduser('~/.local/share/Trash/files')
-                        os.makedirs(trash_dir, exist_ok=True)
-                        trash_path = os.path.join(trash_dir, os.path.basename(file_path))
-                        counter = 1
-                        while os.path.exists(trash_path):
-                            name, ext = os.path.splitext(os.path.basename(file_path))
-                            trash_path = os.path.join(trash_dir, f"{name} ({counter}){ext}")
-                            counter += 1
-                        shutil.move(file_path, trash_path)
-                        action_type = "trash"
+                    # Move to trash directly; no gio subprocess per file
+                    move_to_trash(file_path)
+                    action_type = "trash"
                 
-                # Update database - remove the file entry
-                conn = sqlite3.connect(DB_PATH)
-                c = conn.cursor()
-                c.execute("DELETE FROM files WHERE path = ?", (file_path,))
-                conn.commit()
-                conn.close()
-                
-                # Remove from treeview
-                self.tree.delete(tree_item)
+                # Queue the DB removal for the batched transaction below
+                db_remove.append((file_path,))
+
+                # Remove from treeview in the batched call below
+                tree_remove.append(tree_item)
                 deleted_count += 1
                 
             except PermissionError:
@@ -1034,7 +1565,9 @@ class EverythingApp:
                 failed_files.append(f"{file_name} ({str(e)})")
             except Exception as e:
                 failed_files.append(f"{file_name} (Unexpected error)")
-        
+
+        flush_removals()
+
         # Update status
         if deleted_count > 0:
             action_text = "permanently deleted" if response == "permanent" else "moved to trash"
@@ -1053,94 +1586,115 @@ class EverythingApp:
                                    f"Failed to delete all files:\n" +
                                    "\n".join(failed_files[:10]))
 
-    def show_bulk_delete_confirmation(self, files_list):
-        """Show enhanced delete confirmation dialog for multiple files"""
+    def build_delete_dialog(self):
+        """Build the bulk-delete confirmation dialog once and keep it hidden.
+
+        Toplevel creation on X11 costs tens of milliseconds; the dialog is
+        reused via withdraw()/deiconify() instead of rebuilt per delete.
+        """
         dialog = tk.Toplevel(self.root)
+        dialog.withdraw()
         dialog.title("Confirm Bulk Delete")
         dialog.geometry("600x400")
         dialog.configure(bg='#0A0A0A')
         dialog.transient(self.root)
-        dialog.grab_set()
-        
+        dialog.protocol("WM_DELETE_WINDOW", lambda: self.close_delete_dialog("cancel"))
+
         # Try to set opacity
         try:
             dialog.attributes('-alpha', 0.97)
         except:
             pass
-        
-        result = {"choice": "cancel"}
-        
-        def set_choice(choice):
-            result["choice"] = choice
-            dialog.destroy()
-        
+
         # Title
-        tk.Label(dialog, text=f"Delete {len(files_list)} files?", 
+        self.delete_dialog_title = tk.Label(dialog, text="",
                 font=('Monospace', self.font_size, 'bold'),
-                bg='#0A0A0A', fg='#FF5555').pack(pady=(20, 10))
-        
+                bg='#0A0A0A', fg='#FF5555')
+        self.delete_dialog_title.pack(pady=(20, 10))
+
         # File list in scrollable frame
         list_frame = tk.Frame(dialog, bg='#0A0A0A')
         list_frame.pack(fill=tk.BOTH, expand=True, padx=15, pady=5)
-        
+
         scrollbar = Scrollbar(list_frame)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        file_listbox = Listbox(list_frame, yscrollcommand=scrollbar.set,
-                              font=('Monospace', self.font_size-2), 
+
+        self.delete_dialog_listbox = Listbox(list_frame, yscrollcommand=scrollbar.set,
+                              font=('Monospace', self.font_size-2),
                               bg='#0A0A0A', fg='#AAAAAA',
                               selectbackground='#004400', selectforeground='#00FF00',
                               height=8)
-        file_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.config(command=file_listbox.yview)
-        
-        # Add files to listbox (show only first 50)
-        display_files = files_list[:50]
-        for file_path, file_name, _ in display_files:
-            file_listbox.insert(tk.END, f"• {file_name}")
-        
-        if len(files_list) > 50:
-            file_listbox.insert(tk.END, f"... and {len(files_list) - 50} more files")
-        
+        self.delete_dialog_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.config(command=self.delete_dialog_listbox.yview)
+
         # Warning
-        tk.Label(dialog, text="This action cannot be undone!", 
+        tk.Label(dialog, text="This action cannot be undone!",
                 font=('Monospace', self.font_size-2),
                 bg='#0A0A0A', fg='#FFAA00').pack(pady=(10, 15))
-        
+
         # Button frame
         btn_frame = tk.Frame(dialog, bg='#0A0A0A')
         btn_frame.pack(pady=10)
-        
+
         # Buttons
-        tk.Button(btn_frame, text="Move to Trash", 
-                 command=lambda: set_choice("trash"),
+        tk.Button(btn_frame, text="Move to Trash",
+                 command=lambda: self.close_delete_dialog("trash"),
                  font=('Monospace', self.font_size-2),
                  bg='#0A0A0A', fg='#00FF00',
                  activebackground='#003300', activeforeground='#00FF00',
                  width=15).pack(side=tk.LEFT, padx=5)
-        
-        tk.Button(btn_frame, text="Delete Permanently", 
-                 command=lambda: set_choice("permanent"),
+
+        tk.Button(btn_frame, text="Delete Permanently",
+                 command=lambda: self.close_delete_dialog("permanent"),
                  font=('Monospace', self.font_size-2),
                  bg='#0A0A0A', fg='#FF5555',
                  activebackground='#330000', activeforeground='#FF5555',
                  width=15).pack(side=tk.LEFT, padx=5)
-        
-        tk.Button(btn_frame, text="Cancel", 
-                 command=lambda: set_choice("cancel"),
+
+        tk.Button(btn_frame, text="Cancel",
+                 command=lambda: self.close_delete_dialog("cancel"),
                  font=('Monospace', self.font_size-2),
                  bg='#0A0A0A', fg='#AAAAAA',
                  activebackground='#003300', activeforeground='#AAAAAA',
                  width=10).pack(side=tk.LEFT, padx=5)
-        
+
+        self.delete_dialog_choice = "cancel"
+        self.delete_dialog_done = tk.IntVar(master=self.root, value=0)
+        self.delete_dialog = dialog
+
+    def close_delete_dialog(self, choice):
+        self.delete_dialog_choice = choice
+        self.delete_dialog.grab_release()
+        self.delete_dialog.withdraw()
+        self.delete_dialog_done.set(self.delete_dialog_done.get() + 1)
+
+    def show_bulk_delete_confirmation(self, files_list):
+        """Show enhanced delete confirmation dialog for multiple files"""
+        if self.delete_dialog is None:
+            self.build_delete_dialog()
+
+        self.delete_dialog_title.config(text=f"Delete {len(files_list)} files?")
+
+        # Add files to listbox (show only first 50)
+        self.delete_dialog_listbox.delete(0, tk.END)
+        display_files = files_list[:50]
+        for file_path, file_name, _ in display_files:
+            self.delete_dialog_listbox.insert(tk.END, f"• {file_name}")
+
+        if len(files_list) > 50:
+            self.delete_dialog_listbox.insert(tk.END, f"... and {len(files_list) - 50} more files")
+
         # Center dialog
+        dialog = self.delete_dialog
         dialog.update_idletasks()
         x = self.root.winfo_x() + (self.root.winfo_width() // 2) - (dialog.winfo_width() // 2)
         y = self.root.winfo_y() + (self.root.winfo_height() // 2) - (dialog.winfo_height() // 2)
         dialog.geometry(f"+{x}+{y}")
-        
-        self.root.wait_window(dialog)
-        return result["choice"]
+
+        dialog.deiconify()
+        dialog.grab_set()
+        self.root.wait_variable(self.delete_dialog_done)
+        return self.delete_dialog_choice
 
     def sort_by_column(self, col):
         if self.sort_column == col:
@@ -1148,49 +1702,111 @@ class EverythingApp:
         else:
             self.sort_column = col
             self.sort_reverse = False
+        self.schedule_settings_save()
         self.refresh_list(self.search_var.get().strip())
 
     def on_search_change(self, *args):
         # Cancel previous delayed search if any
         if hasattr(self, '_search_job'):
             self.root.after_cancel(self._search_job)
-        
-        # Schedule new search after 300ms delay
-        self._search_job = self.root.after(300, self.perform_search)
+
+        # Schedule new search once typing pauses
+        self._search_job = self.root.after(SEARCH_DEBOUNCE_MS, self.perform_search)
 
     def perform_search(self):
+        # Run the query off the Tk thread: even a paged query can stall
+        # long enough on a huge DB to make typing stutter. Pooled reader
+        # connections make the concurrent read safe, and the token lets
+        # a slow query lose to the keystroke that superseded it.
         term = self.search_var.get().strip()
-        self.refresh_list(term)
-
-    def refresh_list(self, term=''):
-        for row in self.tree.get_children():
-            self.tree.delete(row)
-        results = search_files(term, limit=1000000)
-        col_index = {'Name':0, 'Size':1, 'Type':2, 'Drive':3, 'Path':4}
-        idx = col_index.get(self.sort_column, 0)
-        results.sort(key=lambda x: x[idx], reverse=self.sort_reverse)
-        for name, size, ftype, full_path in results:
-            # Extract drive letter properly using the function
-            drive_letter = extract_drive_letter(full_path)
-                
-            self.tree.insert('', tk.END, values=(
+        self.search_token += 1
+        token = self.search_token
+
+        def do_search():
+            results = search_files(term, limit=self.page_size,
+                                   sort_col=self.sort_column,
+                                   sort_desc=self.sort_reverse)
+            self.root.after(0, self.apply_search_results, term, token, results)
+        Thread(target=do_search, daemon=True).start()
+
+    def apply_search_results(self, term, token, results):
+        if token != self.search_token:
+            return  # stale: a newer search is already in flight
+        self.tree.delete(*self.tree.get_children())
+        self.iid_path.clear()
+        self.iid_index.clear()
+        self.current_term = term
+        self.result_offset = 0
+        self.all_results_loaded = False
+        self.append_page(results)
+
+    def on_tree_scroll(self, first, last):
+        """yscrollcommand hook: keep the scrollbar in sync and fetch the
+        next page when the view approaches the bottom of what is loaded."""
+        self.tree_scrollbar.set(first, last)
+        if float(last) > 0.9 and not self.all_results_loaded:
+            self.load_next_page()
+
+    def load_next_page(self):
+        results = search_files(self.current_term, limit=self.page_size,
+                               sort_col=self.sort_column,
+                               sort_desc=self.sort_reverse,
+                               offset=self.result_offset)
+        self.append_page(results)
+
+    def append_page(self, results):
+        if len(results) < self.page_size:
+            self.all_results_loaded = True
+        self.result_offset += len(results)
+
+        for name, size, ftype, drive_letter, full_path in results:
+            iid = self.tree.insert('', tk.END, values=(
                 name,
                 self.format_size(size),
                 ftype,
                 drive_letter,
                 full_path
             ))
+            self.iid_path[iid] = full_path
+            self.iid_index[iid] = len(self.iid_index)
 
-        # Bind selection to show path
-        self.tree.bind('<<TreeviewSelect>>', self.show_selected_path)
+        shown = f"{self.result_offset}" if self.all_results_loaded else f"{self.result_offset}+"
+        self.status_var.set(f"Found {shown} files. Indexed folders: {self.get_folder_count()}")
+
+    def schedule_refresh(self):
+        """Coalesce bursts of refresh requests into one listing rebuild.
+
+        Excluding several folders in a row fires a completion callback per
+        folder; rebuilding the Treeview for each is wasted work, so only
+        the last request within 150ms actually refreshes. Must run on the
+        Tk thread — workers get here via root.after(0, ...).
+        """
+        if self.refresh_job is not None:
+            self.root.after_cancel(self.refresh_job)
+        self.refresh_job = self.root.after(150, self._run_scheduled_refresh)
 
-        self.status_var.set(f"Found {len(results)} files. Indexed folders: {self.get_folder_count()}")
+    def _run_scheduled_refresh(self):
+        self.refresh_job = None
+        self.refresh_list(self.search_var.get().strip())
+
+    def refresh_list(self, term=''):
+        # Every folder-mutating path (index, exclude, clear) funnels
+        # through here, so this is the one place the count can go stale
+        self._folder_count = None
+        # One starred delete clears the tree in a single Tcl pass
+        self.tree.delete(*self.tree.get_children())
+        self.iid_path.clear()
+        self.iid_index.clear()
+        self.current_term = term
+        self.result_offset = 0
+        self.all_results_loaded = False
+        self.load_next_page()
 
     def show_selected_path(self, event=None):
         sel = self.tree.selection()
         if sel:
             if len(sel) == 1:
-                full_path = self.tree.item(sel[0])['values'][4]
+                full_path = self.iid_path.get(sel[0])
                 self.status_var.set(f"Selected: {full_path}")
             else:
                 self.status_var.set(f"Selected {len(sel)} files")
@@ -1220,10 +1836,11 @@ class EverythingApp:
                 self.bulk_rename_files(sel)
             return
         
-        # Original single file rename logic
-        item = self.tree.item(sel[0])
-        old_path = item['values'][4]
-        old_name = item['values'][0]
+        # Original single file rename logic. item(iid, 'values') returns
+        # just the tuple instead of serializing the whole row dict.
+        vals = self.tree.item(sel[0], 'values')
+        old_path = vals[4]
+        old_name = vals[0]
         
         # Check if file exists
         if not os.path.exists(old_path):
@@ -1268,22 +1885,23 @@ class EverythingApp:
             os.rename(old_path, new_path)
             
             # Update database
-            conn = sqlite3.connect(DB_PATH)
-            c = conn.cursor()
-            
+            conn = get_db()
+
             # Get file stats for update
             stat = os.stat(new_path)
             _, ext = os.path.splitext(new_name)
-            
-            # Update the file record
-            c.execute('''UPDATE files 
-                        SET path = ?, name = ?, size = ?, modified = ?, type = ?, indexed_date = ?
-                        WHERE path = ?''',
-                     (new_path, new_name, stat.st_size, stat.st_mtime, 
-                      ext.lower(), datetime.now().timestamp(), old_path))
-            
-            conn.commit()
-            conn.close()
+
+            # Update the file record; hold the write lock so this commit
+            # cannot land inside a worker's open transaction
+            with _db_write_lock:
+                c = conn.cursor()
+                c.execute('''UPDATE files
+                            SET path = ?, name = ?, size = ?, modified = ?, type = ?, indexed_date = ?
+                            WHERE path = ?''',
+                         (new_path, new_name, stat.st_size, stat.st_mtime,
+                          ext.lower(), datetime.now().timestamp(), old_path))
+
+                conn.commit()
             
             # Refresh display
             self.refresh_list(self.search_var.get().strip())
@@ -1310,38 +1928,59 @@ class EverythingApp:
             return
         
         renamed_count = 0
+        now = datetime.now().timestamp()
+        updates = []
         for i, item_id in enumerate(selected_items):
-            item = self.tree.item(item_id)
-            old_path = item['values'][4]
-            old_name = item['values'][0]
-            
+            vals = self.tree.item(item_id, 'values')
+            old_path = vals[4]
+            old_name = vals[0]
+
             if not os.path.exists(old_path):
                 continue
-            
+
             # Create new name with pattern
             name_part, ext = os.path.splitext(old_name)
             new_name = f"{base_name} ({i+1}){ext}"
             new_path = os.path.join(os.path.dirname(old_path), new_name)
-            
+
             try:
                 os.rename(old_path, new_path)
-                
-                # Update database
-                conn = sqlite3.connect(DB_PATH)
-                c = conn.cursor()
                 stat = os.stat(new_path)
-                c.execute('''UPDATE files 
-                            SET path = ?, name = ?, size = ?, modified = ?, indexed_date = ?
-                            WHERE path = ?''',
-                         (new_path, new_name, stat.st_size, stat.st_mtime, 
-                          datetime.now().timestamp(), old_path))
-                conn.commit()
-                conn.close()
-                
+                updates.append((new_path, new_name, stat.st_size, stat.st_mtime,
+                                now, old_path))
                 renamed_count += 1
             except Exception as e:
                 pass  # Silent fail for bulk operations
-        
+
+        # One transaction for all the row updates instead of an UPDATE and
+        # commit per renamed file; retried while the DB is busy
+        if updates:
+            self.apply_rename_updates(updates, renamed_count)
+        else:
+            self.refresh_list(self.search_var.get().strip())
+            self.status_var.set(f"Bulk renamed {renamed_count} files")
+
+    def apply_rename_updates(self, updates, renamed_count):
+        """Write queued bulk-rename row updates, rescheduling while busy.
+
+        The files are already renamed on disk by the time this runs, so a
+        locked DB (e.g. a scan holding the writer lock) must not drop the
+        updates — the stale rows would point at paths that no longer
+        exist. Keep them queued and retry until the write lands.
+        """
+        conn = get_db()
+        try:
+            with _db_write_lock:
+                with conn:
+                    conn.executemany('''UPDATE files
+                                SET path = ?, name = ?, size = ?, modified = ?, indexed_date = ?
+                                WHERE path = ?''', updates)
+        except sqlite3.OperationalError as e:
+            self.status_var.set(
+                f"Database busy, retrying {len(updates)} rename update(s): {e}")
+            self.root.after(1000, lambda: self.apply_rename_updates(updates, renamed_count))
+            return
+
         # Refresh and show result
         self.refresh_list(self.search_var.get().strip())
         self.status_var.set(f"Bulk renamed {renamed_count} files")
@@ -1355,8 +1994,7 @@ class EverythingApp:
         
         if len(sel) == 1:
             # Single file - copy full path
-            item = self.tree.item(sel[0])
-            full_path = item['values'][4]
+            full_path = self.iid_path.get(sel[0])
             
             if copy_to_clipboard(full_path):
                 self.status_var.set(f"📋 Copied path to clipboard: {full_path}")
@@ -1367,9 +2005,7 @@ class EverythingApp:
             # Multiple files - copy all paths separated by newlines
             paths = []
             for item_id in sel:
-                item = self.tree.item(item_id)
-                full_path = item['values'][4]
-                paths.append(full_path)
+                paths.append(self.iid_path.get(item_id))
             
             clipboard_text = "\n".join(paths)
             if copy_to_clipboard(clipboard_text):
@@ -1386,8 +2022,7 @@ class EverythingApp:
         
         if len(sel) == 1:
             # Single file
-            item = self.tree.item(sel[0])
-            filename = item['values'][0]
+            filename = self.tree.item(sel[0], 'values')[0]
             
             if copy_to_clipboard(filename):
                 self.status_var.set(f"📋 Copied filename: {filename}")
@@ -1398,9 +2033,7 @@ class EverythingApp:
             # Multiple files
             filenames = []
             for item_id in sel:
-                item = self.tree.item(item_id)
-                filename = item['values'][0]
-                filenames.append(filename)
+                filenames.append(self.tree.item(item_id, 'values')[0])
             
             clipboard_text = "\n".join(filenames)
             if copy_to_clipboard(clipboard_text):
@@ -1417,9 +2050,8 @@ class EverythingApp:
         
         if len(sel) == 1:
             # Single file
-            item = self.tree.item(sel[0])
-            full_path = item['values'][4]
-            
+            full_path = self.iid_path.get(sel[0])
+
             if copy_to_clipboard(full_path):
                 self.status_var.set(f"📋 Copied path: {full_path}")
             else:
@@ -1429,9 +2061,7 @@ class EverythingApp:
             # Multiple files
             paths = []
             for item_id in sel:
-                item = self.tree.item(item_id)
-                full_path = item['values'][4]
-                paths.append(full_path)
+                paths.append(self.iid_path.get(item_id))
             
             clipboard_text = "\n".join(paths)
             if copy_to_clipboard(clipboard_text):
@@ -1444,12 +2074,15 @@ class EverythingApp:
     def export_csv(self):
         """Export search results to CSV file - FIXED VERSION"""
         term = self.search_var.get().strip()
-        results = search_files(term, limit=1000000)
-        
-        if not results:
+        # Stream straight from the cursor: a million-row export no longer
+        # builds a million-tuple list before the first byte hits disk
+        cursor = search_files(term, limit=1000000, stream=True)
+        first = cursor.fetchone()
+
+        if first is None:
             messagebox.showwarning("No Data", "Nothing to export.")
             return
-        
+
         # Ask for filename
         default_name = f"search_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
         filename = filedialog.asksaveasfilename(
@@ -1457,24 +2090,30 @@ class EverythingApp:
             initialfile=default_name,
             filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
         )
-        
+
         if not filename:
             return  # User cancelled
-        
+
         try:
-            with open(filename, 'w', newline='', encoding='utf-8') as f:
+            row_count = 1
+
+            def remaining():
+                nonlocal row_count
+                for row in cursor:
+                    row_count += 1
+                    yield row
+
+            with open(filename, 'w', newline='', encoding='utf-8',
+                      buffering=1 << 20) as f:
                 writer = csv.writer(f)
                 writer.writerow(['Name', 'Size (bytes)', 'Type', 'Drive', 'Path'])
-                
-                for row in results:
-                    name, size, ftype, full_path = row
-                    drive_letter = extract_drive_letter(full_path)
-                    writer.writerow([name, size, ftype, drive_letter, full_path])
-            
+                writer.writerow(first)
+                writer.writerows(remaining())
+
             # Show success message
-            self.status_var.set(f"✅ Exported {len(results)} rows to {os.path.basename(filename)}")
-            messagebox.showinfo("Export Successful", 
-                              f"Successfully exported {len(results)} rows to:\n{filename}")
+            self.status_var.set(f"✅ Exported {row_count} rows to {os.path.basename(filename)}")
+            messagebox.showinfo("Export Successful",
+                              f"Successfully exported {row_count} rows to:\n{filename}")
             
         except PermissionError:
             messagebox.showerror("Permission Error", 
@@ -1485,94 +2124,116 @@ class EverythingApp:
 
     def is_valid_filename(self, filename):
         """Check if filename is valid"""
-        if not filename or not filename.strip():
-            return False
-        
-        # Check for invalid characters (basic check)
-        invalid_chars = ['/', '\\', ':', '*', '?', '"', '<', '>', '|']
-        for char in invalid_chars:
-            if char in filename:
-                return False
-        
-        # Check for reserved names
-        reserved_names = ['CON', 'PRN', 'AUX', 'NUL', 
-                         'COM1', 'COM2', 'COM3', 'COM4', 'COM5', 'COM6', 'COM7', 'COM8', 'COM9',
-                         'LPT1', 'LPT2', 'LPT3', 'LPT4', 'LPT5', 'LPT6', 'LPT7', 'LPT8', 'LPT9']
-        if filename.upper() in reserved_names:
-            return False
-        
-        return True
+        return bool(filename and filename.strip()
+                    and not _INVALID_FILENAME_RE.search(filename)
+                    and filename.upper() not in _RESERVED_NAMES)
     
     def load_column_widths(self):
         """Load saved column widths and sort settings"""
         try:
-            if os.path.exists(SETTINGS_FILE):
+            # Re-parse only when the file actually changed on disk;
+            # repeated loads during a session hit the in-process cache
+            st = os.stat(SETTINGS_FILE)
+            if self.settings_cache is not None and st.st_mtime == self.settings_mtime:
+                widths = self.settings_cache
+            else:
                 with open(SETTINGS_FILE, 'r') as f:
                     widths = json.load(f)
-                    for col, width in widths.items():
-                        if col in self.columns:
-                            self.tree.column(col, width=width)
-                    # Load sort settings
-                    self.sort_column = widths.get('sort_column', 'name')
-                    self.sort_reverse = widths.get('sort_reverse', False)
+                self.settings_cache = widths
+                self.settings_mtime = st.st_mtime
+            for col, width in widths.items():
+                if col in self.columns:
+                    self.tree.column(col, width=width)
+            # Load sort settings
+            self.sort_column = widths.get('sort_column', 'name')
+            self.sort_reverse = widths.get('sort_reverse', False)
         except:
             pass  # Use defaults if load fails
-    
+
+    def schedule_settings_save(self):
+        """Coalesce bursts of settings changes into one write after 500ms."""
+        if self.settings_save_job is not None:
+            self.root.after_cancel(self.settings_save_job)
+        self.settings_save_job = self.root.after(500, self.save_column_widths)
+
     def save_column_widths(self):
         """Save current column widths and sort settings"""
+        self.settings_save_job = None
         try:
             os.makedirs(os.path.dirname(SETTINGS_FILE), exist_ok=True)
             widths = {col: self.tree.column(col, 'width') for col in self.columns}
             # Add sort settings
             widths['sort_column'] = self.sort_column
             widths['sort_reverse'] = self.sort_reverse
-            with open(SETTINGS_FILE, 'w') as f:
+            if widths == self.settings_cache:
+                return  # Nothing changed since the last write
+            # Write-then-rename so a crash mid-dump never leaves a
+            # truncated settings file behind
+            tmp = SETTINGS_FILE + '.tmp'
+            with open(tmp, 'w') as f:
                 json.dump(widths, f)
+            os.replace(tmp, SETTINGS_FILE)
+            self.settings_cache = widths
+            self.settings_mtime = os.stat(SETTINGS_FILE).st_mtime
         except:
             pass  # Don't crash if save fails
-    
+
     def on_closing(self):
         """Save settings when app closes"""
         self.save_column_widths()
         self.root.destroy()
 
     def index_drive(self):
-        initial_dir = '/media' if os.path.exists('/media') else '/'
         folder = filedialog.askdirectory(
             title="Select a drive/folder to index",
-            initialdir=initial_dir
+            initialdir=self.initial_dir
         )
         if folder:
             def do_index():
-                self.status_var.set("Indexing...")
-                success, msg = index_folder(folder, cleanup=False)
-                self.status_var.set(msg)
-                self.refresh_list(self.search_var.get().strip())
+                self.progress_q.put("Indexing...")
+                success, _, _, msg = index_folder(folder, cleanup=False,
+                                                  progress_callback=self.progress_q.put)
+                self.progress_q.put(msg)
+                self.root.after(0, lambda: self.refresh_list(self.search_var.get().strip()))
             Thread(target=do_index, daemon=True).start()
 
     def exclude_folder(self):
-        initial_dir = '/media' if os.path.exists('/media') else '/'
         folder = filedialog.askdirectory(
             title="Select folder to exclude (and all its subfolders)",
-            initialdir=initial_dir
+            initialdir=self.initial_dir
         )
         if folder:
-            conn = sqlite3.connect(DB_PATH)
-            c = conn.cursor()
-            c.execute("SELECT id FROM folders WHERE path = ?", (folder,))
-            row = c.fetchone()
-            
-            if row:
-                c.execute("UPDATE folders SET excluded = 'EXCLUDED' WHERE id = ?", (row[0],))
-                c.execute("DELETE FROM files WHERE folder_id = ?", (row[0],))
-            else:
-                c.execute("INSERT INTO folders (path, excluded) VALUES (?, 'EXCLUDED')", (folder,))
-            
-            conn.commit()
-            conn.close()
-            
-            self.status_var.set(f"Excluded folder: {os.path.basename(folder)}")
-            self.refresh_list(self.search_var.get().strip())
+            # The DELETE can cover millions of rows on a big excluded tree,
+            # so run it on a worker thread in one transaction and let the
+            # progress queue carry the status back to the Tk thread
+            def do_exclude():
+                conn = get_db()
+                try:
+                    with _db_write_lock:
+                        c = conn.cursor()
+                        try:
+                            c.execute("BEGIN IMMEDIATE")
+                            # Upsert against the UNIQUE path column: one statement
+                            # covers both the known-folder and new-folder cases
+                            c.execute('''INSERT INTO folders (path, excluded, excluded_i) VALUES (?, 'EXCLUDED', 1)
+                                         ON CONFLICT(path) DO UPDATE SET excluded = 'EXCLUDED', excluded_i = 1''',
+                                      (folder,))
+                            c.execute("DELETE FROM files WHERE folder_id = (SELECT id FROM folders WHERE path = ?)",
+                                      (folder,))
+                            conn.commit()
+                        except sqlite3.Error:
+                            conn.rollback()
+                            raise
+                except sqlite3.Error as e:
+                    # A running scan can hold the writer lock past the busy
+                    # timeout; surface the failure instead of losing the
+                    # exclusion to a silently dead thread
+                    self.progress_q.put(f"Could not exclude {os.path.basename(folder)}: {e}")
+                    return
+
+                self.progress_q.put(f"Excluded folder: {os.path.basename(folder)}")
+                self.root.after(0, self.schedule_refresh)
+            Thread(target=do_exclude, daemon=True).start()
 
     def manage_exclusions(self):
         win = tk.Toplevel(self.root)
@@ -1601,29 +2262,31 @@ class EverythingApp:
         lb.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.config(command=lb.yview)
         
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_db()
         c = conn.cursor()
-        c.execute("SELECT path FROM folders WHERE excluded = 'EXCLUDED'")
+        # Fetch ids alongside the paths so removal updates by primary key
+        # instead of re-resolving the path through the UNIQUE index
+        c.execute("SELECT id, path FROM folders WHERE excluded_i = 1")
         rows = c.fetchall()
-        conn.close()
-        
-        for row in rows:
-            lb.insert(tk.END, row[0])
-        if not rows:
+
+        if rows:
+            # One Tcl crossing for the whole list instead of one per row
+            lb.insert(tk.END, *(row[1] for row in rows))
+        else:
             lb.insert(tk.END, "(No excluded folders)")
-        
+
         def remove_exclusion():
             sel = lb.curselection()
-            if sel:
-                folder = lb.get(sel[0])
-                conn = sqlite3.connect(DB_PATH)
-                c = conn.cursor()
-                c.execute("UPDATE folders SET excluded = '' WHERE path = ?", (folder,))
-                conn.commit()
-                conn.close()
+            if sel and rows:
+                folder_id, folder = rows.pop(sel[0])
+                conn = get_db()
+                with _db_write_lock:
+                    c = conn.cursor()
+                    c.execute("UPDATE folders SET excluded = '', excluded_i = 0 WHERE id = ?", (folder_id,))
+                    conn.commit()
                 lb.delete(sel[0])
                 self.status_var.set(f"Removed exclusion: {os.path.basename(folder)}")
-                self.refresh_list(self.search_var.get().strip())
+                self.schedule_refresh()
         
         btn_frame = tk.Frame(win, bg='#0A0A0A')
         btn_frame.pack(pady=10)
@@ -1643,14 +2306,19 @@ class EverythingApp:
                                "This will delete ALL indexed files and folders.\n"
                                "This action cannot be undone.\n\nProceed?"):
             try:
-                # Delete database and settings
-                if os.path.exists(DB_PATH):
-                    os.remove(DB_PATH)
+                # Truncate through SQL so the shared connection stays
+                # valid; deleting the DB file would force every handle to
+                # reopen and the schema to be rebuilt
+                conn = get_db()
+                with _db_write_lock:
+                    with conn:
+                        conn.execute("DELETE FROM files")
+                        conn.execute("DELETE FROM folders")
+                    conn.execute("VACUUM")
+
                 if os.path.exists(SETTINGS_FILE):
                     os.remove(SETTINGS_FILE)
-                
-                # Reinitialize
-                init_db()
+
                 self.refresh_all()
                 messagebox.showinfo("Cleared", "All indexes have been removed.")
             except Exception as e:
@@ -1667,22 +2335,25 @@ class EverythingApp:
         if sel:
             # Open all selected files
             for item_id in sel:
-                full_path = self.tree.item(item_id)['values'][4]
+                full_path = self.iid_path.get(item_id)
                 if full_path and os.path.exists(full_path):
-                    os.system(f'xdg-open "{full_path}"')
+                    # No shell: saves a /bin/sh fork per file and avoids
+                    # quoting problems with '"' in filenames
+                    subprocess.Popen(['xdg-open', full_path],
+                                     stdout=subprocess.DEVNULL,
+                                     stderr=subprocess.DEVNULL,
+                                     start_new_session=True)
                 else:
                     messagebox.showinfo("File Not Found",
                                         f"File not found: {full_path}")
                     break  # Stop on first error
 
     # ==================== ENHANCED CONTEXT MENU ====================
-    def show_context_menu(self, event):
-        """Show enhanced context menu with copy/cut options - NOW WITH OPEN CONTAINING FOLDER"""
-        sel = self.tree.selection()
-        if not sel:
-            return
-        
-        menu = Menu(self.root, tearoff=0, 
+    def build_context_menu(self):
+        """Build the right-click menu once; every entry is a Tcl command
+        registration plus a font lookup, so rebuilding the menu per click
+        is pure waste when the entries never change."""
+        menu = Menu(self.root, tearoff=0,
                    font=('Monospace', self.font_size-2),
                    bg='#0A0A0A', fg='#00FF00',
                    activebackground='#003300', activeforeground='#00FF00')
@@ -1704,14 +2375,14 @@ class EverythingApp:
         menu.add_cascade(label="Copy", menu=copy_menu)
         
         # Cut functionality (similar to delete but first copies path)
-        menu.add_command(label="Cut (Move to Trash)", 
-                        command=lambda: self.cut_to_trash())
-        
+        menu.add_command(label="Cut (Move to Trash)",
+                        command=self.cut_to_trash)
+
         menu.add_separator()
-        
+
         # Rename and Delete
-        menu.add_command(label="Rename (F2)", command=lambda: self.smart_rename_or_copy())
-        menu.add_command(label="Delete (Del)", command=lambda: self.delete_selected_file())
+        menu.add_command(label="Rename (F2)", command=self.smart_rename_or_copy)
+        menu.add_command(label="Delete (Del)", command=self.delete_selected_file)
         menu.add_separator()
         
         # Rescan options
@@ -1722,8 +2393,18 @@ class EverythingApp:
         menu.add_separator()
         menu.add_command(label="Exclude This Folder", command=self.exclude_this_folder)
         menu.add_command(label="Exclude Subfolder...", command=self.exclude_subfolder)
-        
-        menu.tk_popup(event.x_root, event.y_root)
+
+        self.context_menu = menu
+
+    def show_context_menu(self, event):
+        """Show enhanced context menu with copy/cut options - NOW WITH OPEN CONTAINING FOLDER"""
+        sel = self.tree.selection()
+        if not sel:
+            return
+
+        if self.context_menu is None:
+            self.build_context_menu()
+        self.context_menu.tk_popup(event.x_root, event.y_root)
 
     def cut_to_trash(self):
         """Cut file (copy path to clipboard, then move to trash) - NOW SUPPORTS MULTIPLE"""
@@ -1731,14 +2412,9 @@ class EverythingApp:
         if not sel:
             return
         
-        # First copy all paths to clipboard
-        paths = []
-        for item_id in sel:
-            item = self.tree.item(item_id)
-            file_path = item['values'][4]
-            paths.append(file_path)
-        
-        clipboard_text = "\n".join(paths)
+        # First copy all paths to clipboard; join straight off the iid
+        # map instead of building an intermediate list
+        clipboard_text = "\n".join(self.iid_path.get(item_id, '') for item_id in sel)
         copy_to_clipboard(clipboard_text)
         
         # Then delete all files
@@ -1748,75 +2424,61 @@ class EverythingApp:
         sel = self.tree.selection()
         if sel:
             # Use first selected item to get folder
-            full_path = self.tree.item(sel[0])['values'][4]
+            full_path = self.iid_path.get(sel[0])
             if full_path:
                 folder = os.path.dirname(full_path)
                 def do_rescan():
-                    self.status_var.set(f"Rescanning {folder}...")
-                    success, msg = index_folder(folder, cleanup=False)
-                    self.status_var.set(msg)
-                    self.refresh_list(self.search_var.get().strip())
+                    self.progress_q.put(f"Rescanning {folder}...")
+                    success, _, _, msg = index_folder(folder, cleanup=False)
+                    self.progress_q.put(msg)
+                    self.root.after(0, lambda: self.refresh_list(self.search_var.get().strip()))
                 Thread(target=do_rescan, daemon=True).start()
 
     def rescan_cleanup(self):
         sel = self.tree.selection()
         if sel:
-            full_path = self.tree.item(sel[0])['values'][4]
+            full_path = self.iid_path.get(sel[0])
             if full_path:
                 folder = os.path.dirname(full_path)
                 def do_rescan():
-                    self.status_var.set(f"Rescanning (cleanup) {folder}...")
-                    success, msg = index_folder(folder, cleanup=True)
-                    self.status_var.set(msg)
-                    self.refresh_list(self.search_var.get().strip())
+                    self.progress_q.put(f"Rescanning (cleanup) {folder}...")
+                    success, _, _, msg = index_folder(folder, cleanup=True)
+                    self.progress_q.put(msg)
+                    self.root.after(0, lambda: self.refresh_list(self.search_var.get().strip()))
                 Thread(target=do_rescan, daemon=True).start()
 
     def rescan_entire_drive(self):
         sel = self.tree.selection()
         if sel:
-            full_path = self.tree.item(sel[0])['values'][4]
+            full_path = self.iid_path.get(sel[0])
             if full_path:
-                if '/media/' in full_path:
-                    parts = full_path.split('/')
-                    if len(parts) >= 4:
-                        drive_root = '/'.join(parts[:4])
-                    else:
-                        drive_root = full_path
-                else:
-                    drive_root = '/' + full_path.split('/')[1] if '/' in full_path else full_path
-                
+                drive_root = _drive_root(full_path)
+
                 def do_rescan():
-                    self.status_var.set(f"Rescanning entire drive {os.path.basename(drive_root)}...")
+                    self.progress_q.put(f"Rescanning entire drive {os.path.basename(drive_root)}...")
                     success, msg = rescan_drive(drive_root, cleanup=False)
-                    self.status_var.set(msg)
-                    self.refresh_list(self.search_var.get().strip())
+                    self.progress_q.put(msg)
+                    self.root.after(0, lambda: self.refresh_list(self.search_var.get().strip()))
                 Thread(target=do_rescan, daemon=True).start()
 
     def rescan_entire_drive_cleanup(self):
         sel = self.tree.selection()
         if sel:
-            full_path = self.tree.item(sel[0])['values'][4]
+            full_path = self.iid_path.get(sel[0])
             if full_path:
-                if '/media/' in full_path:
-                    parts = full_path.split('/')
-                    if len(parts) >= 4:
-                        drive_root = '/'.join(parts[:4])
-                    else:
-                        drive_root = full_path
-                else:
-                    drive_root = '/' + full_path.split('/')[1] if '/' in full_path else full_path
-                
+                drive_root = _drive_root(full_path)
+
                 def do_rescan():
-                    self.status_var.set(f"Rescanning entire drive {os.path.basename(drive_root)} (cleanup)...")
+                    self.progress_q.put(f"Rescanning entire drive {os.path.basename(drive_root)} (cleanup)...")
                     success, msg = rescan_drive(drive_root, cleanup=True)
-                    self.status_var.set(msg)
-                    self.refresh_list(self.search_var.get().strip())
+                    self.progress_q.put(msg)
+                    self.root.after(0, lambda: self.refresh_list(self.search_var.get().strip()))
                 Thread(target=do_rescan, daemon=True).start()
 
     def exclude_subfolder(self):
         sel = self.tree.selection()
         if sel:
-            full_path = self.tree.item(sel[0])['values'][4]
+            full_path = self.iid_path.get(sel[0])
             if full_path:
                 folder = os.path.dirname(full_path)
                 sub = filedialog.askdirectory(title="Select subfolder to exclude", initialdir=folder)
@@ -1824,77 +2486,80 @@ class EverythingApp:
                     rel = os.path.relpath(sub, folder)
                     update_excluded(folder, rel)
                     self.status_var.set(f"Excluded subfolder: {rel}")
-                    self.refresh_list(self.search_var.get().strip())
+                    self.schedule_refresh()
 
     def exclude_this_folder(self):
         sel = self.tree.selection()
         if sel:
-            full_path = self.tree.item(sel[0])['values'][4]
+            full_path = self.iid_path.get(sel[0])
             if full_path:
                 folder = os.path.dirname(full_path)
-                conn = sqlite3.connect(DB_PATH)
-                c = conn.cursor()
-                c.execute("SELECT id FROM folders WHERE path = ?", (folder,))
-                folder_row = c.fetchone()
-                if folder_row:
-                    folder_id = folder_row[0]
-                    c.execute("UPDATE folders SET excluded = 'EXCLUDED' WHERE id = ?", (folder_id,))
-                    c.execute("DELETE FROM files WHERE folder_id = ?", (folder_id,))
-                    conn.commit()
-                
-                conn.close()
-                self.status_var.set(f"Excluded folder: {os.path.basename(folder)}")
-                self.refresh_list(self.search_var.get().strip())
 
-    def get_folder_count(self):
-        conn = sqlite3.connect(DB_PATH)
-        c = conn.cursor()
-        c.execute("SELECT COUNT(*) FROM folders WHERE excluded != 'EXCLUDED'")
-        count = c.fetchone()[0]
-        conn.close()
-        return count
+                def do_exclude():
+                    conn = get_db()
+                    try:
+                        with _db_write_lock:
+                            c = conn.cursor()
+                            try:
+                                c.execute("BEGIN IMMEDIATE")
+                                c.execute("SELECT id FROM folders WHERE path = ?", (folder,))
+                                folder_row = c.fetchone()
+                                if folder_row:
+                                    folder_id = folder_row[0]
+                                    c.execute("UPDATE folders SET excluded = 'EXCLUDED', excluded_i = 1 WHERE id = ?", (folder_id,))
+                                    c.execute("DELETE FROM files WHERE folder_id = ?", (folder_id,))
+                                conn.commit()
+                            except sqlite3.Error:
+                                conn.rollback()
+                                raise
+                    except sqlite3.Error as e:
+                        # See exclude_folder: report a locked-out write
+                        # rather than dying silently with the exclusion lost
+                        self.progress_q.put(f"Could not exclude {os.path.basename(folder)}: {e}")
+                        return
+
+                    self.progress_q.put(f"Excluded folder: {os.path.basename(folder)}")
+                    self.root.after(0, self.schedule_refresh)
+                Thread(target=do_exclude, daemon=True).start()
 
+    def get_folder_count(self):
+        if self._folder_count is None:
+            conn = get_reader()
+            try:
+                c = conn.cursor()
+                # Answered entirely from the partial index over active folders
+                c.execute("SELECT COUNT(*) FROM folders WHERE excluded_i = 0")
+                self._folder_count = c.fetchone()[0]
+            finally:
+                put_reader(conn)
+        return self._folder_count
+
+    # File sizes cluster hard (0, 4096, 8192, ...), so most rows in a page
+    # hit the cache instead of re-running the unit loop and formatting
     @staticmethod
+    @functools.lru_cache(maxsize=4096)
     def format_size(size):
-        if size == 0:
+        if size <= 0:
             return "0 B"
-        
-        units = ['B', 'KB', 'MB', 'GB', 'TB']
-        for unit in units:
-            if size < 1024.0:
-                return f"{size:.1f} {unit}"
-            size /= 1024.0
-        return f"{size:.1f} PB"
+
+        # bit_length picks the unit in O(1) instead of looping through
+        # float divides; 2**10i is the matching power-of-1024 divisor
+        i = min((size.bit_length() - 1) // 10, 5)
+        return f"{size / (1 << (10 * i)):.1f} {('B', 'KB', 'MB', 'GB', 'TB', 'PB')[i]}"
 
     @staticmethod
     def parse_size(size_str):
-        size_str = size_str.strip()
-        
-        units = {
-            'B': 1,
-            'KB': 1024,
-            'MB': 1024**2,
-            'GB': 1024**3,
-            'TB': 1024**4,
-            'PB': 1024**5
-        }
-        
-        for unit, multiplier in units.items():
-            if size_str.upper().endswith(unit):
-                num_part = size_str[:-len(unit)].strip()
-                try:
-                    num = float(num_part)
-                    return int(num * multiplier)
-                except ValueError:
-                    try:
-                        return int(float(size_str))
-                    except:
-                        return 0
-        
+        m = _SIZE_RE.match(size_str)
+        if not m:
+            try:
+                return int(float(size_str))
+            except:
+                return 0
         try:
-            return int(float(size_str))
-        except:
+            num = float(m.group(1))
+        except ValueError:
             return 0
+        return int(num * _SIZE_MULT[(m.group(2) or 'B').upper()])
 
 def main():
     """Main entry point for the application"""